@@ -0,0 +1,97 @@
+"""
+Static CORS Middleware
+
+Wildcard CORS (any origin, method and header, with credentials) handled
+with headers precomputed as bytes at import time. Preflight requests are
+answered directly and simple responses get the cached headers appended,
+matching the responses of Starlette's CORSMiddleware for this
+configuration without rebuilding header lists per request.
+"""
+
+from typing import List, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+ALLOWED_METHODS = frozenset(
+    m.encode() for m in ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+)
+
+_SIMPLE_HEADERS: Headers = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-credentials", b"true"),
+]
+
+_PREFLIGHT_HEADERS: Headers = [
+    (b"access-control-allow-methods", b", ".join(sorted(ALLOWED_METHODS))),
+    (b"access-control-max-age", b"600"),
+    (b"access-control-allow-credentials", b"true"),
+    (b"vary", b"Origin"),
+]
+
+_PREFLIGHT_OK = b"OK"
+_PREFLIGHT_FAILED = b"Disallowed CORS method"
+
+
+class StaticCORSMiddleware:
+    """ASGI middleware allowing every origin, method and header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        has_cookie = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+            elif name == b"cookie":
+                has_cookie = True
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(send, origin, request_method, request_headers)
+            return
+
+        if has_cookie:
+            # Browsers reject "*" on credentialed requests, so echo the origin
+            cors_headers = [
+                (b"access-control-allow-origin", origin),
+                (b"access-control-allow-credentials", b"true"),
+                (b"vary", b"Origin"),
+            ]
+        else:
+            cors_headers = _SIMPLE_HEADERS
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    @staticmethod
+    async def _preflight(send, origin: bytes, request_method: bytes, request_headers):
+        headers = [(b"access-control-allow-origin", origin), *_PREFLIGHT_HEADERS]
+        if request_headers is not None:
+            headers.append((b"access-control-allow-headers", request_headers))
+
+        if request_method in ALLOWED_METHODS:
+            status, body = 200, _PREFLIGHT_OK
+        else:
+            status, body = 400, _PREFLIGHT_FAILED
+        headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        headers.append((b"content-length", str(len(body)).encode()))
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -5,7 +5,7 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -21,12 +21,26 @@ db = None
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
+# Pool limits are totals for the whole server; every uvicorn worker process
+# keeps its own pool, so each one gets an equal share
+_workers = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+max_pool_size = max(int(os.getenv("MONGO_MAX_POOL_SIZE", "100")) // _workers, 1)
+_min_pool_total = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+# Keep at least one warm connection per worker unless the warm pool is disabled
+min_pool_size = max(min(_min_pool_total // _workers, max_pool_size), 1) if _min_pool_total > 0 else 0
+
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # Keep a warm pool between bursts instead of reconnecting on demand
+    _client = AsyncIOMotorClient(
+        database_url,
+        maxPoolSize=max_pool_size,
+        minPoolSize=min_pool_size,
+        maxIdleTimeMS=60000,
+    )
     db = _client[database_name]
 
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
     """Insert a single document with timestamp"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
@@ -40,10 +54,10 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
@@ -52,4 +66,4 @@ def get_documents(collection_name: str, filter_dict: dict = None, limit: int = N
     if limit:
         cursor = cursor.limit(limit)
     
-    return list(cursor)
+    return await cursor.to_list(length=None)
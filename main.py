@@ -1,29 +1,69 @@
+import asyncio
+import logging
 import os
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+import orjson
+from fastapi import FastAPI, HTTPException, Path, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+from typing import Any, Dict, List, Optional, Tuple
 from bson import ObjectId
 
-from database import db, create_document, get_documents
+from cors import StaticCORSMiddleware
+from database import db, create_document
 from schemas import ModelSpec, Deployment, GenerationJob, User, Product
 
-app = FastAPI(title="AI Model Platform API", version="1.0.0")
+# Deployment URLs share one prefix; read it once (after database.py loads .env)
+PUBLIC_BACKEND_URL = os.getenv("PUBLIC_BACKEND_URL", "").rstrip("/")
+SERVE_PREFIX = f"{PUBLIC_BACKEND_URL}/serve/"
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+logger = logging.getLogger(__name__)
+
+
+async def _warm_database():
+    # Open the first pooled connection without holding up startup
+    try:
+        await db.command("ping")
+    except Exception as e:
+        logger.warning("MongoDB warm-up failed: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up = asyncio.create_task(_warm_database()) if db is not None else None
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+
+app = FastAPI(title="AI Model Platform API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
+
+app.add_middleware(StaticCORSMiddleware)
+
+_ROOT_BODY = orjson.dumps({"message": "AI Platform backend is live"})
 
 @app.get("/")
-def read_root():
-    return {"message": "AI Platform backend is live"}
+async def read_root():
+    return Response(content=_ROOT_BODY, media_type="application/json")
+
+# Seconds a /test report is reused, so probe storms don't each hit MongoDB
+TEST_RESPONSE_TTL = 5.0
+_test_response_cache: Optional[Tuple[float, "asyncio.Task[Dict[str, Any]]"]] = None
+
 
 @app.get("/test")
-def test_database():
+async def test_database():
+    global _test_response_cache
+    now = time.monotonic()
+    if _test_response_cache is None or now - _test_response_cache[0] >= TEST_RESPONSE_TTL:
+        # Cache the in-flight build so concurrent probes share one MongoDB call
+        _test_response_cache = (now, asyncio.create_task(_build_test_response()))
+    # Shielded so a disconnecting caller doesn't cancel the build for the others
+    return await asyncio.shield(_test_response_cache[1])
+
+
+async def _build_test_response() -> Dict[str, Any]:
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -40,7 +80,7 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -51,9 +91,9 @@ def test_database():
     except Exception as e:
         response["database"] = f"❌ Error: {str(e)[:50]}"
 
-    import os as _os
-    response["database_url"] = "✅ Set" if _os.getenv("DATABASE_URL") else "❌ Not Set"
-    response["database_name"] = "✅ Set" if _os.getenv("DATABASE_NAME") else "❌ Not Set"
+    env = os.environ
+    response["database_url"] = "✅ Set" if env.get("DATABASE_URL") else "❌ Not Set"
+    response["database_name"] = "✅ Set" if env.get("DATABASE_NAME") else "❌ Not Set"
 
     return response
 
@@ -62,26 +102,71 @@ def test_database():
 def _collection_name(model_cls: Any) -> str:
     return model_cls.__name__.lower()
 
+# Collection names are fixed per schema, so resolve them once at import
+MODELSPEC_COLL = _collection_name(ModelSpec)
+DEPLOYMENT_COLL = _collection_name(Deployment)
+GENJOB_COLL = _collection_name(GenerationJob)
+
+# Exposes _id as a string "id" field server-side, so documents need no Python rewriting
+PUBLIC_PROJECTION: List[Dict[str, Any]] = [
+    {"$addFields": {"id": {"$toString": "$_id"}}},
+    {"$project": {"_id": 0}},
+]
+
+
+# Model ids are 24-char hex ObjectIds; malformed ids are rejected with a 422 before any query
+OBJECT_ID_PATTERN = r"^[0-9a-fA-F]{24}$"
+
+
+# Documents fetched per cursor round-trip (and flushed per chunk) by list endpoints
+LIST_BATCH_SIZE = 500
+
+
+async def _iter_public_json(head: bytes, cursor, batch_size: int):
+    """Yield the already-fetched first batch, then the rest of the JSON array."""
+    yield head
+    chunk: List[bytes] = []
+    async for doc in cursor:
+        chunk.append(b"," + orjson.dumps(doc))
+        if len(chunk) >= batch_size:
+            yield b"".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield b"".join(chunk)
+    yield b"]"
 
-def _to_public(doc: Dict[str, Any]) -> Dict[str, Any]:
-    if not doc:
-        return doc
-    if "_id" in doc:
-        doc["id"] = str(doc.pop("_id"))
-    return doc
+
+async def _stream_public(collection_name: str, limit: int) -> Response:
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not configured")
+
+    limit = abs(limit)
+    batch_size = min(limit, LIST_BATCH_SIZE) if limit else LIST_BATCH_SIZE
+    pipeline = ([{"$limit": limit}] if limit else []) + PUBLIC_PROJECTION
+    cursor = db[collection_name].aggregate(pipeline, batchSize=batch_size)
+
+    # Fetch and encode the first batch before committing to a status code, so
+    # connection, query and encoding errors still surface as a 500
+    first = await cursor.to_list(length=batch_size)
+    head = b"[" + b",".join(orjson.dumps(doc) for doc in first)
+    if len(first) < batch_size or len(first) == limit:
+        return Response(content=head + b"]", media_type="application/json")
+    return StreamingResponse(_iter_public_json(head, cursor, batch_size), media_type="application/json")
 
 # Schemas endpoint for viewer tooling
+_SCHEMA_BODY = orjson.dumps({
+    "models": [
+        "user",
+        "product",
+        "modelspec",
+        "deployment",
+        "generationjob",
+    ]
+})
+
 @app.get("/schema")
-def get_schema_definitions():
-    return {
-        "models": [
-            "user",
-            "product",
-            "modelspec",
-            "deployment",
-            "generationjob",
-        ]
-    }
+async def get_schema_definitions():
+    return Response(content=_SCHEMA_BODY, media_type="application/json")
 
 # AI Platform Endpoints
 
@@ -89,12 +174,22 @@ class PromptRequest(BaseModel):
     prompt: str
     parameters: Optional[Dict[str, Any]] = None
 
-@app.post("/api/generate", status_code=201)
-def generate_model(req: PromptRequest):
-    # Create a GenerationJob entry as running
-    job = GenerationJob(prompt=req.prompt, status="running", model_id=None)
-    job_id = create_document(_collection_name(GenerationJob), job)
+# Response shapes for the list endpoints (stored documents plus id and timestamps)
+
+class ModelSpecPublic(ModelSpec):
+    """A stored ModelSpec as exposed by GET /api/models."""
+    id: str = Field(..., description="Document id")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
+class DeploymentPublic(Deployment):
+    """A stored Deployment as exposed by GET /api/deployments."""
+    id: str = Field(..., description="Document id")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+@app.post("/api/generate", status_code=201)
+async def generate_model(req: PromptRequest):
     # Simulate a quick synchronous generation for demo purposes
     model = ModelSpec(
         name=req.parameters.get("name", "Prompt Model") if req and req.parameters else "Prompt Model",
@@ -104,53 +199,65 @@ def generate_model(req: PromptRequest):
         parameters=req.parameters or {},
         artifacts=["weights://mock/model.bin", "tokenizer://mock/vocab.json"],
     )
-    model_id = create_document(_collection_name(ModelSpec), model)
+    model_id = await create_document(MODELSPEC_COLL, model)
 
-    # Update job to completed
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not configured")
-    db[_collection_name(GenerationJob)].update_one({"_id": ObjectId(job_id)}, {"$set": {"status": "completed", "model_id": model_id}})
+    # Generation is synchronous, so the job is recorded directly as completed
+    job = GenerationJob.model_construct(prompt=req.prompt, status="completed", model_id=model_id)
+    job_id = await create_document(GENJOB_COLL, job)
 
     return {"job_id": job_id, "model_id": model_id}
 
-@app.get("/api/models")
-def list_models(limit: int = 50):
-    docs = get_documents(_collection_name(ModelSpec), limit=limit)
-    return [_to_public(d) for d in docs]
+# response_model only documents the stream; it never validates or serializes the output
+@app.get("/api/models", response_model=List[ModelSpecPublic])
+async def list_models(limit: int = 50):
+    return await _stream_public(MODELSPEC_COLL, limit)
 
 class DeployRequest(BaseModel):
-    model_id: str
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_id: str = Field(..., pattern=OBJECT_ID_PATTERN)
     name: Optional[str] = None
 
+    _object_id: ObjectId = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        # Parse the id once so handlers don't re-parse it per query
+        self._object_id = ObjectId(self.model_id)
+
+    @property
+    def object_id(self) -> ObjectId:
+        return self._object_id
+
 @app.post("/api/deploy", status_code=201)
-def deploy_model(req: DeployRequest):
+async def deploy_model(req: DeployRequest):
     # Verify model exists
     if db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
-    model = db[_collection_name(ModelSpec)].find_one({"_id": ObjectId(req.model_id)})
-    if not model:
+    exists = await db[MODELSPEC_COLL].find_one({"_id": req.object_id}, {"_id": 1}) is not None
+    if not exists:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    deployment = Deployment(
+    # Every field comes from validated request data, so skip re-validation
+    deployment = Deployment.model_construct(
         model_id=req.model_id,
         name=req.name or f"deployment-{req.model_id[-6:]}",
-        url=f"{os.getenv('PUBLIC_BACKEND_URL', '')}/serve/{req.model_id}",
+        url=SERVE_PREFIX + req.model_id,
         status="active",
     )
-    dep_id = create_document(_collection_name(Deployment), deployment)
+    dep_id = await create_document(DEPLOYMENT_COLL, deployment)
     return {"deployment_id": dep_id}
 
-@app.get("/api/deployments")
-def list_deployments(limit: int = 50):
-    docs = get_documents(_collection_name(Deployment), limit=limit)
-    return [_to_public(d) for d in docs]
+# response_model only documents the stream; it never validates or serializes the output
+@app.get("/api/deployments", response_model=List[DeploymentPublic])
+async def list_deployments(limit: int = 50):
+    return await _stream_public(DEPLOYMENT_COLL, limit)
 
 @app.get("/serve/{model_id}")
-def serve_model(model_id: str, q: Optional[str] = None):
+async def serve_model(model_id: str = Path(..., pattern=OBJECT_ID_PATTERN), q: Optional[str] = None):
     # Placeholder serving that just echoes a response
     if db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
-    model = db[_collection_name(ModelSpec)].find_one({"_id": ObjectId(model_id)})
+    model = await db[MODELSPEC_COLL].find_one({"_id": ObjectId(model_id)}, {"name": 1})
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
 
@@ -163,4 +270,7 @@ def serve_model(model_id: str, q: Optional[str] = None):
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    # Workers inherit this, so database.py can split the Mongo pool budget between them
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run("main:app", host="0.0.0.0", port=port, loop="uvloop", http="httptools", workers=workers)
@@ -11,7 +11,7 @@ Model name is converted to lowercase for the collection name:
 - BlogPost -> "blogs" collection
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any, List
 
 # Example schemas (kept for reference):
@@ -42,6 +42,8 @@ class Product(BaseModel):
 
 class ModelSpec(BaseModel):
     """Represents a trained or generated model."""
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Display name for the model")
     prompt: str = Field(..., description="Prompt or instructions the model was created from")
     version: str = Field("v1", description="Semantic version of the model")
@@ -51,6 +53,8 @@ class ModelSpec(BaseModel):
 
 class Deployment(BaseModel):
     """Represents a deployment of a model to a serving endpoint."""
+    model_config = ConfigDict(frozen=True, protected_namespaces=())
+
     model_id: str = Field(..., description="ID of the model being deployed")
     name: str = Field(..., description="Deployment name")
     url: Optional[str] = Field(None, description="Public URL for serving")
@@ -58,6 +62,8 @@ class Deployment(BaseModel):
 
 class GenerationJob(BaseModel):
     """Represents a background job to generate a model from a prompt."""
+    model_config = ConfigDict(frozen=True, protected_namespaces=())
+
     prompt: str = Field(..., description="Prompt to generate the model")
     status: str = Field("completed", description="Job status: queued|running|completed|failed")
     model_id: Optional[str] = Field(None, description="Resulting model id, if completed")